@@ -1,3 +1,4 @@
+import functools
 import json
 from collections import OrderedDict
 from difflib import SequenceMatcher
@@ -6,7 +7,10 @@ from datetime import timedelta, date, datetime, time
 from dateutil.parser import parse
 from django.apps import apps
 from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.http import JsonResponse
 from django.template.loader import render_to_string
+from django.urls import URLResolver, get_resolver, path, reverse
 from django.utils.html import escape
 from django.utils import timezone
 from django.shortcuts import redirect
@@ -53,7 +57,7 @@ def cast_to_str(value: Union[dict, list]):
 
 class RequestLogChangeModelAdminMixin:
     model = RequestLogChange
-    fields = ("change_type", "instance", "changes_table", "record")
+    fields = ("change_type", "instance", "update_count", "changes_table", "record")
     readonly_fields = ("changes_table",)
     inline_classes = ("grp-collapse grp-open",)
 
@@ -147,6 +151,74 @@ class WeekListFilter(admin.SimpleListFilter):
         return queryset
 
 
+def iter_url_names(patterns, namespace="", prefix=""):
+    # Значения совпадают с RequestLogRecord.url_name: имя маршрута с пространством имён или шаблон маршрута
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_url_names(
+                pattern.url_patterns,
+                f"{namespace}{pattern.namespace}:" if pattern.namespace else namespace,
+                prefix + str(pattern.pattern),
+            )
+        elif pattern.name:
+            yield f"{namespace}{pattern.name}"
+        else:
+            yield prefix + str(pattern.pattern)
+
+
+@functools.lru_cache(maxsize=None)
+def get_url_names() -> tuple:
+    return tuple(sorted(set(iter_url_names(get_resolver().url_patterns))))
+
+
+class UrlNameListFilter(admin.SimpleListFilter):
+    title = "маршрут"
+    parameter_name = "url_name"
+    template = "drf_orm_logger/url_name_filter.html"
+
+    def __init__(self, request, params, model, model_admin):
+        super().__init__(request, params, model, model_admin)
+        self.autocomplete_url = reverse(
+            f"{model_admin.admin_site.name}:{model._meta.app_label}_{model._meta.model_name}_url_name_autocomplete"
+        )
+
+    def has_output(self):
+        return True
+
+    def lookups(self, request, model_admin):
+        # Значения подгружаются автодополнением из маршрутов проекта, см. get_url_names
+        return []
+
+    def choices(self, changelist):
+        yield {
+            "value": self.value(),
+            "parameter_name": self.parameter_name,
+            "query_string": changelist.get_query_string(remove=[self.parameter_name]),
+            "autocomplete_url": self.autocomplete_url,
+        }
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(url_name=self.value())
+        return queryset
+
+
+class ChangedModelListFilter(admin.SimpleListFilter):
+    title = "изменённая модель"
+    parameter_name = "changed_model"
+
+    def lookups(self, request, model_admin):
+        from .signals import get_models_to_log
+
+        labels = sorted({f"{model._meta.app_label}.{model._meta.object_name}" for model in get_models_to_log()})
+        return [(label, label) for label in labels]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(changed_models__contains=[self.value()])
+        return queryset
+
+
 class DateRedirectMixin:
     show_full_result_count = False
     def changelist_view(self, request, extra_context=None):
@@ -165,15 +237,27 @@ class DateRedirectMixin:
 
 @admin.register(RequestLogRecord)
 class RequestLogRecordModelAdmin(DateRedirectMixin, ReadOnlyModelAdminMixin, admin.ModelAdmin):
-    list_display = ("created_at", "user", "ip", "referer", "method", "status_code", "url")
-    list_filter = (WeekListFilter, "method", "status_code", "user")
+    list_display = (
+        "created_at",
+        "user",
+        "ip",
+        "referer",
+        "method",
+        "status_code",
+        "url_name",
+        "url",
+        "changes_count",
+        "created_count",
+        "updated_count",
+        "deleted_count",
+        "changed_models",
+    )
+    list_filter = (WeekListFilter, UrlNameListFilter, ChangedModelListFilter, "method", "status_code", "user")
     list_select_related = ("user",)
     search_fields = (
         "user__email",
         "user__username",
         "ip",
-        "referer",
-        "url",
         "changes__instance",
     )
     inlines = (RequestLogChangeModelAdminInline,)
@@ -181,6 +265,26 @@ class RequestLogRecordModelAdmin(DateRedirectMixin, ReadOnlyModelAdminMixin, adm
     def get_queryset(self, request):
         return super().get_queryset(request).prefetch_related("user")
 
+    def get_urls(self):
+        info = self.model._meta.app_label, self.model._meta.model_name
+        return [
+            path(
+                "url-name-autocomplete/",
+                self.admin_site.admin_view(self.url_name_autocomplete_view),
+                name="%s_%s_url_name_autocomplete" % info,
+            ),
+        ] + super().get_urls()
+
+    def url_name_autocomplete_view(self, request):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        term = request.GET.get("term", "").lower()
+        url_names = [url_name for url_name in get_url_names() if term in url_name.lower()][:20]
+        return JsonResponse({"results": [{"id": url_name, "text": url_name} for url_name in url_names]})
+
+    class Media:
+        js = ("drf_orm_logger/url_name_filter.js",)
+
 
 @admin.register(RequestLogChange)
 class RequestLogChangeModelAdmin(DateRedirectMixin, admin.ModelAdmin, RequestLogChangeModelAdminMixin):
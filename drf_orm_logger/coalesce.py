@@ -0,0 +1,148 @@
+import atexit
+import functools
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from copy import deepcopy
+
+from django.conf import settings
+from django.db import connections
+from django.dispatch import receiver
+from django.test.signals import setting_changed
+
+from .sinks import get_sink
+
+logger = logging.getLogger(__name__)
+
+
+def get_coalesce_settings() -> dict:
+    return getattr(settings, "REQUESTS_LOGGER_SETTINGS", {}).get("COALESCE", {})
+
+
+@functools.lru_cache(maxsize=None)
+def get_coalesced_fields(model):
+    """
+    Поля модели, изменения которых объединяются.
+
+    Возвращает None, если объединение для модели не настроено, и пустое множество, если объединяются
+    изменения любых полей.
+    """
+    for label, fields in get_coalesce_settings().get("MODELS", {}).items():
+        if label.lower() == model._meta.label_lower:
+            return frozenset(fields or ())
+    return None
+
+
+def should_coalesce(model, changed_fields: dict) -> bool:
+    fields = get_coalesced_fields(model)
+    if fields is None:
+        return False
+    return not fields or set(changed_fields) <= fields
+
+
+class ChangeCoalescer:
+    """
+    Объединение частых изменений одного объекта в одну запись.
+
+    Изменения объекта в пределах окна window секунд копятся в памяти процесса: у каждого поля сохраняется
+    первое старое и последнее новое значение, а update_count считает количество изменений. Запись уходит
+    в хранилище, когда окно закрывается или когда в кэше больше max_keys объектов.
+    """
+
+    def __init__(self, window: float = 60, max_keys: int = 10000):
+        self.window = window
+        self.max_keys = max_keys
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._pid = None
+        self._thread = None
+
+    def add(self, change: dict):
+        now = time.monotonic()
+        with self._lock:
+            self._check_pid()
+            entry = self._entries.get(change["instance"])
+            if entry is None:
+                self._entries[change["instance"]] = {
+                    "opened_at": now,
+                    "change": {**deepcopy(change), "update_count": 1},
+                }
+            else:
+                fields = entry["change"]["fields"]
+                for name, field_changes in change["fields"].items():
+                    if name in fields:
+                        fields[name]["new"] = field_changes["new"]
+                    else:
+                        fields[name] = deepcopy(field_changes)
+                entry["change"]["update_count"] += 1
+            ready = self._pop_ready(now)
+        self._save(ready)
+
+    def pop(self, instance: str):
+        """Записать накопленное изменение объекта до его следующего, не объединяемого изменения."""
+        with self._lock:
+            self._check_pid()
+            entry = self._entries.pop(instance, None)
+        if entry is not None:
+            self._save([entry["change"]])
+
+    def flush(self, force: bool = True):
+        with self._lock:
+            self._check_pid()
+            ready = self._pop_ready(None if force else time.monotonic())
+        self._save(ready)
+
+    def _check_pid(self):
+        # После fork кэш и поток сброса принадлежат родительскому процессу
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._entries = OrderedDict()
+            self._thread = threading.Thread(target=self._run, name="drf_orm_logger.coalesce", daemon=True)
+            self._thread.start()
+
+    def _pop_ready(self, now):
+        ready = []
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if now is not None and len(self._entries) <= self.max_keys and now - entry["opened_at"] < self.window:
+                break
+            del self._entries[key]
+            ready.append(entry["change"])
+        return ready
+
+    def _save(self, changes: list):
+        for change in changes:
+            try:
+                get_sink().save_change(change)
+            except Exception as e:
+                logger.exception(e)
+
+    def _run(self):
+        while True:
+            time.sleep(self.window)
+            try:
+                self.flush(force=False)
+            finally:
+                connections.close_all()
+
+
+@functools.lru_cache(maxsize=None)
+def get_coalescer() -> ChangeCoalescer:
+    coalesce_settings = get_coalesce_settings()
+    coalescer = ChangeCoalescer(
+        window=coalesce_settings.get("WINDOW", 60),
+        max_keys=coalesce_settings.get("MAX_KEYS", 10000),
+    )
+    atexit.register(coalescer.flush)
+    return coalescer
+
+
+@receiver(setting_changed)
+def reset_coalescer(setting, **kwargs):  # noqa
+    if setting == "REQUESTS_LOGGER_SETTINGS":
+        if get_coalescer.cache_info().currsize:
+            get_coalescer().flush()
+        get_coalescer.cache_clear()
+        get_coalesced_fields.cache_clear()
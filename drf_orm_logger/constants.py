@@ -1,3 +1,6 @@
 CHANGE_TYPE_CREATE = "create"
 CHANGE_TYPE_UPDATE = "update"
 CHANGE_TYPE_DELETE = "delete"
+
+CAPTURE_ENGINE_SIGNALS = "signals"
+CAPTURE_ENGINE_TRIGGERS = "triggers"
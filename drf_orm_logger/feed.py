@@ -0,0 +1,148 @@
+import functools
+import operator
+from typing import Iterable, Iterator, Optional, Tuple, Union
+
+from django.apps import apps
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import RequestLogChange, RequestLogFeedCursor
+
+RECORD_FIELDS = ("id", "created_at", "user_id", "ip", "method", "url", "url_name", "view_name", "status_code")
+
+
+def get_instance_prefix(model: Union[str, type]) -> str:
+    if isinstance(model, str):
+        # Метки сравниваются без учёта регистра, как в suspend_logging и настройках
+        label = model.lower()
+        model = next((m for m in apps.get_models() if m._meta.label_lower == label), None)
+        if model is None:
+            raise LookupError(f"Unknown model: {label!r}")
+    return f"{model._meta.app_label}.{model._meta.object_name}."
+
+
+def serialize_change(change: RequestLogChange) -> dict:
+    record = change.record
+    return {
+        "id": change.id,
+        "created_at": change.created_at.isoformat(),
+        "change_type": change.change_type,
+        "instance": change.instance,
+        "fields": change.fields,
+        "update_count": change.update_count,
+        "record": (
+            {
+                name: value.isoformat() if name == "created_at" else value
+                for name, value in ((name, getattr(record, name)) for name in RECORD_FIELDS)
+            }
+            if record is not None
+            else None
+        ),
+    }
+
+
+def get_settled_id(after_id: int = 0, scan_size: int = 500, lag: float = 0, settle_timeout: float = 60) -> int:
+    """
+    Наибольший id после after_id, до которого включительно лента может сдвинуться.
+
+    id выделяются до фиксации транзакции, поэтому изменение с меньшим id может появиться позже изменения
+    с большим. Просмотр останавливается на первом изменении младше lag секунд, а также на изменении младше
+    settle_timeout секунд, перед которым есть пропуск в id (транзакция с пропущенным id может быть ещё
+    не зафиксирована) или которое сделано в запросе, но ещё не связано с его записью (запрос может его
+    дополнить). Пропуски старше settle_timeout считаются откаченными транзакциями или удалёнными записями.
+    """
+    now = timezone.now()
+    last_id = after_id
+    rows = (
+        RequestLogChange.objects.filter(id__gt=after_id)
+        .order_by("id")
+        .values_list("id", "created_at", "record_id", "request_token")[:scan_size]
+    )
+    for change_id, created_at, record_id, request_token in rows:
+        age = (now - created_at).total_seconds()
+        in_request = request_token is not None and record_id is None
+        if age < lag or (age < settle_timeout and (change_id != last_id + 1 or in_request)):
+            break
+        last_id = change_id
+    return last_id
+
+
+def get_changes_batch(
+    after_id: int = 0,
+    batch_size: int = 500,
+    models: Optional[Iterable[Union[str, type]]] = None,
+    lag: float = 0,
+    settle_timeout: float = 60,
+) -> Tuple[list, int]:
+    """
+    Следующая порция изменений с id больше after_id в порядке возрастания id и id, с которого
+    продолжать чтение. Если id не изменился, новых окончательных изменений нет.
+
+    models - классы моделей или метки "app_label.ObjectName". Выдаются только изменения до get_settled_id.
+    """
+    settled_id = get_settled_id(after_id, scan_size=batch_size, lag=lag, settle_timeout=settle_timeout)
+    queryset = (
+        RequestLogChange.objects.select_related("record")
+        .filter(id__gt=after_id, id__lte=settled_id)
+        .order_by("id")
+    )
+    if models:
+        queryset = queryset.filter(
+            functools.reduce(operator.or_, (Q(instance__startswith=get_instance_prefix(m)) for m in models))
+        )
+    batch = [serialize_change(change) for change in queryset[:batch_size]]
+    return batch, batch[-1]["id"] if len(batch) == batch_size else settled_id
+
+
+class ChangeFeed:
+    """
+    Лента изменений для именованного потребителя.
+
+    Позиция потребителя хранится в RequestLogFeedCursor и сдвигается после обработки каждой порции,
+    поэтому при перезапуске потребитель продолжает с последней обработанной порции (at-least-once).
+
+        for change in ChangeFeed("search-indexer", models=["catalog.Product"]):
+            ...
+    """
+
+    def __init__(
+        self,
+        consumer: str,
+        models: Optional[Iterable[Union[str, type]]] = None,
+        batch_size: int = 500,
+        lag: float = 0,
+        settle_timeout: float = 60,
+    ):
+        self.consumer = consumer
+        self.models = list(models) if models else None
+        self.batch_size = batch_size
+        self.lag = lag
+        self.settle_timeout = settle_timeout
+
+    @property
+    def last_id(self) -> int:
+        return RequestLogFeedCursor.objects.get_or_create(name=self.consumer)[0].last_id
+
+    def commit(self, last_id: int):
+        RequestLogFeedCursor.objects.update_or_create(name=self.consumer, defaults={"last_id": last_id})
+
+    def batches(self) -> Iterator[list]:
+        last_id = self.last_id
+        while True:
+            batch, next_id = get_changes_batch(
+                last_id,
+                batch_size=self.batch_size,
+                models=self.models,
+                lag=self.lag,
+                settle_timeout=self.settle_timeout,
+            )
+            if next_id == last_id:
+                return
+            if batch:
+                yield batch
+            last_id = next_id
+            self.commit(last_id)
+
+    def __iter__(self) -> Iterator[dict]:
+        for batch in self.batches():
+            yield from batch
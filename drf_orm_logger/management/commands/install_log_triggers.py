@@ -0,0 +1,38 @@
+import logging
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from ...triggers import get_create_trigger_sql, get_drop_trigger_sql, get_function_sql, get_models_to_capture
+
+logger = logging.getLogger("default")
+
+
+class Command(BaseCommand):
+    help = "Создать PostgreSQL-триггеры для логирования изменений моделей (CAPTURE_ENGINE = triggers)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--drop", action="store_true", help="Удалить триггеры")
+        parser.add_argument("--sql", action="store_true", help="Вывести SQL без выполнения")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Triggers are supported only for PostgreSQL")
+
+        log_out_request = getattr(settings, "REQUESTS_LOGGER_SETTINGS", {}).get("LOG_OBJECTS_OUT_REQUEST", True)
+        statements = [] if options["drop"] else [get_function_sql()]
+        models = get_models_to_capture()
+        for model in models:
+            statements.append(get_drop_trigger_sql(model))
+            if not options["drop"]:
+                statements.append(get_create_trigger_sql(model, log_out_request=log_out_request))
+
+        if options["sql"]:
+            self.stdout.write("\n".join(statements))
+            return
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+        logger.info(f"{'Dropped' if options['drop'] else 'Installed'} triggers for {len(models)} models")
@@ -0,0 +1,108 @@
+import json
+import logging
+import os
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import IntegrityError, transaction
+from django.utils.dateparse import parse_datetime
+
+from ...models import RequestLogChange, RequestLogLoadedFile, RequestLogRecord
+
+logger = logging.getLogger("default")
+
+
+@contextmanager
+def preserve_created_at(*models):
+    # bulk_create перезаписывает auto_now_add поля текущим временем
+    fields = [model._meta.get_field("created_at") for model in models]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def build_instance(model, data: dict):
+    attnames = {field.attname for field in model._meta.concrete_fields} - {"id"}
+    values = {key: value for key, value in data.items() if key in attnames}
+    values["created_at"] = parse_datetime(values["created_at"])
+    return model(**values)
+
+
+class Command(BaseCommand):
+    help = "Загрузить в базу данных ротированные JSONL-файлы лога http-запросов"
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="+")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--delete", action="store_true", help="Удалить файл после успешной загрузки")
+
+    def handle(self, *args, **options):
+        with preserve_created_at(RequestLogRecord, RequestLogChange):
+            for path in options["paths"]:
+                # Файл отмечается загруженным в той же транзакции, что и его записи,
+                # поэтому повторный запуск не загружает его второй раз
+                name = os.path.basename(path)
+                try:
+                    with transaction.atomic():
+                        RequestLogLoadedFile.objects.create(name=name)
+                        records, changes = self._load_file(path, batch_size=options["batch_size"])
+                except IntegrityError:
+                    if not RequestLogLoadedFile.objects.filter(name=name).exists():
+                        raise
+                    logger.warning(f"Skip already loaded file {path}")
+                else:
+                    logger.info(f"Loaded {records} records and {changes} changes from {path}")
+                if options["delete"]:
+                    os.remove(path)
+
+    def _load_file(self, path: str, batch_size: int):
+        total_records, total_changes = 0, 0
+        batch = []
+        with open(path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    batch.append(json.loads(line))
+                except ValueError:
+                    # Последняя строка может быть записана не полностью
+                    logger.warning(f"Skip malformed line {line_number} in {path}")
+                    continue
+                if len(batch) >= batch_size:
+                    records, changes = self._save_batch(batch)
+                    total_records, total_changes = total_records + records, total_changes + changes
+                    batch = []
+        if batch:
+            records, changes = self._save_batch(batch)
+            total_records, total_changes = total_records + records, total_changes + changes
+        return total_records, total_changes
+
+    def _save_batch(self, batch: list):
+        user_ids = {entry.get("user_id") for entry in batch if entry.get("user_id") is not None}
+        existing_user_ids = set(get_user_model().objects.filter(pk__in=user_ids).values_list("pk", flat=True))
+
+        record_entries = [entry for entry in batch if entry.get("type") == "record"]
+        records = []
+        for entry in record_entries:
+            record = build_instance(RequestLogRecord, entry)
+            if record.user_id not in existing_user_ids:
+                record.user_id = None
+            records.append(record)
+        records = RequestLogRecord.objects.bulk_create(records)
+
+        changes = []
+        for entry in batch:
+            if entry.get("type") == "change":
+                changes.append(build_instance(RequestLogChange, entry))
+        for record, entry in zip(records, record_entries):
+            for change_entry in entry.get("changes", []):
+                change = build_instance(RequestLogChange, change_entry)
+                change.record = record
+                changes.append(change)
+        RequestLogChange.objects.bulk_create(changes)
+        return len(records), len(changes)
@@ -0,0 +1,180 @@
+import heapq
+import itertools
+import json
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F, Max, Min
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from ...models import RequestLogChange, RequestLogRecord
+
+
+class Stats:
+    def __init__(self):
+        self.rows = defaultdict(int)
+        self.bytes = defaultdict(int)
+
+    def add(self, key, size: int, weight: int = 1):
+        self.rows[key] += weight
+        self.bytes[key] += size * weight
+
+    def as_list(self, limit=None):
+        keys = sorted(self.rows, key=lambda key: (-self.bytes[key], -self.rows[key]))[:limit]
+        return [{"key": key, "rows": self.rows[key], "bytes": self.bytes[key]} for key in keys]
+
+
+class TopCounter:
+    """
+    Приближённый подсчёт самых частых ключей в ограниченной памяти (алгоритм Space-Saving).
+
+    Для ключей с большим количеством значений (пользователи, маршруты, объекты): хранится не больше capacity
+    ключей, вытесненный ключ передаёт свои счётчики новому, поэтому значения могут быть завышены.
+    Ключ с минимальным счётчиком ищется по куче, устаревшие элементы которой пропускаются при извлечении.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts = {}
+        self.bytes = {}
+        self._heap = []
+        self._order = itertools.count()
+
+    def add(self, key, size: int = 0, weight: int = 1):
+        if key not in self.counts:
+            if len(self.counts) < self.capacity:
+                self.counts[key], self.bytes[key] = 0, 0
+            else:
+                min_key = self._pop_min()
+                self.counts[key], self.bytes[key] = self.counts.pop(min_key), self.bytes.pop(min_key)
+        self.counts[key] += weight
+        self.bytes[key] += size * weight
+        # Порядковый номер нужен, чтобы не сравнивать ключи разных типов при равных счётчиках
+        heapq.heappush(self._heap, (self.counts[key], next(self._order), key))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(count, next(self._order), key) for key, count in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self):
+        # Счётчики только растут, поэтому элемент актуален, только если совпадает с текущим счётчиком ключа
+        while True:
+            count, _, key = heapq.heappop(self._heap)
+            if self.counts.get(key) == count:
+                return key
+
+    def as_list(self, limit: int):
+        keys = sorted(self.counts, key=self.counts.get, reverse=True)[:limit]
+        return [{"key": key, "rows": self.counts[key], "bytes": self.bytes[key]} for key in keys]
+
+
+def get_json_size(value) -> int:
+    return len(json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+class Command(BaseCommand):
+    help = "Показать, какие модели, поля, маршруты и пользователи создают объём лога http-запросов"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=1, help="Окно в днях до текущего момента")
+        parser.add_argument("--since", help="Начало окна (ISO 8601), заменяет --days")
+        parser.add_argument("--until", help="Конец окна (ISO 8601)")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+        parser.add_argument("--sample", type=float, default=1.0, help="Доля просматриваемых строк, от 0 до 1, округляется до 1/N")
+        parser.add_argument("--top", type=int, default=20)
+        parser.add_argument("--format", choices=("table", "json"), default="table")
+
+    def handle(self, *args, **options):
+        until = self._parse_datetime(options["until"]) if options["until"] else timezone.now()
+        since = self._parse_datetime(options["since"]) if options["since"] else until - timedelta(days=options["days"])
+        if not 0 < options["sample"] <= 1:
+            raise CommandError("--sample must be in (0, 1]")
+        # Выборка делается по остатку от деления id, поэтому доля округляется до 1/N
+        sample_step = round(1 / options["sample"])
+        top = options["top"]
+
+        records_by_endpoint, records_by_user = TopCounter(capacity=top * 10), TopCounter(capacity=top * 10)
+        record_rows = self._iterate(
+            RequestLogRecord, since, until, options["chunk_size"], sample_step, ("url_name", "user_id", "url", "referer")
+        )
+        for url_name, user_id, url, referer in record_rows:
+            size = len(url.encode("utf-8")) + len(referer.encode("utf-8"))
+            records_by_endpoint.add(url_name or "-", size, sample_step)
+            records_by_user.add(user_id or "-", size, sample_step)
+
+        by_model, by_field = Stats(), Stats()
+        by_endpoint, by_user, instances = (TopCounter(capacity=top * 10) for _ in range(3))
+        change_rows = self._iterate(
+            RequestLogChange,
+            since,
+            until,
+            options["chunk_size"],
+            sample_step,
+            ("instance", "fields", "record__url_name", "record__user_id"),
+        )
+        for instance, fields, url_name, user_id in change_rows:
+            fields = fields or {}
+            size = get_json_size(fields)
+            model = instance.rsplit(".", 1)[0]
+            by_model.add(model, size, sample_step)
+            by_endpoint.add(url_name or "-", size, sample_step)
+            by_user.add(user_id or "-", size, sample_step)
+            for name, value in fields.items():
+                by_field.add(f"{model}.{name}", get_json_size(value), sample_step)
+            instances.add(instance, size, sample_step)
+
+        report = {
+            "since": since.isoformat(),
+            "until": until.isoformat(),
+            "sample": 1 / sample_step,
+            "records_by_endpoint": records_by_endpoint.as_list(top),
+            "records_by_user": records_by_user.as_list(top),
+            "changes_by_model": by_model.as_list(top),
+            "changes_by_field": by_field.as_list(top),
+            "changes_by_endpoint": by_endpoint.as_list(top),
+            "changes_by_user": by_user.as_list(top),
+            "hottest_instances": instances.as_list(top),
+        }
+        if options["format"] == "json":
+            self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2, default=str))
+        else:
+            self._write_table(report)
+
+    def _parse_datetime(self, value: str):
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise CommandError(f"Invalid datetime: {value}")
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+    def _iterate(self, model, since, until, chunk_size: int, sample_step: int, fields: tuple):
+        queryset = model.objects.filter(created_at__gte=since, created_at__lt=until)
+        id_range = queryset.aggregate(min_id=Min("id"), max_id=Max("id"))
+        min_id, max_id = id_range["min_id"], id_range["max_id"]
+        if min_id is None:
+            return
+        if sample_step > 1:
+            queryset = queryset.annotate(sample_bucket=F("id") % sample_step).filter(sample_bucket=0)
+
+        current_id = min_id
+        while current_id <= max_id:
+            batch_end = current_id + chunk_size * sample_step - 1
+            yield from queryset.filter(id__gte=current_id, id__lte=batch_end).order_by().values_list(*fields)
+            current_id = batch_end + 1
+
+    def _write_table(self, report: dict):
+        self.stdout.write(f"Window: {report['since']} - {report['until']}, sample: {report['sample']}")
+        for section, rows in report.items():
+            if not isinstance(rows, list):
+                continue
+            self.stdout.write("")
+            self.stdout.write(self.style.MIGRATE_HEADING(section))
+            if not rows:
+                self.stdout.write("  -")
+                continue
+            width = max(len(str(row["key"])) for row in rows)
+            self.stdout.write(f"  {'':<{width}}  {'rows':>12}  {'bytes':>14}")
+            for row in rows:
+                self.stdout.write(f"  {str(row['key']):<{width}}  {row['rows']:>12}  {row['bytes']:>14}")
@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.utils.encoders import JSONEncoder
+
+from ...feed import ChangeFeed, get_changes_batch
+
+
+class Command(BaseCommand):
+    help = "Вывести новые изменения из лога http-запросов в формате JSON lines"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--consumer", help="Имя потребителя, позиция которого хранится в базе данных")
+        parser.add_argument("--after-id", type=int, default=0, help="Начальный id, если потребитель не указан")
+        parser.add_argument("--models", nargs="*", help="Метки моделей вида app_label.ObjectName")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--lag", type=float, default=0, help="Не выдавать изменения младше lag секунд")
+        parser.add_argument(
+            "--settle-timeout",
+            type=float,
+            default=60,
+            help="Сколько секунд ждать незафиксированные транзакции и связывание изменений с запросом",
+        )
+        parser.add_argument("--follow", action="store_true", help="Ожидать новые изменения")
+        parser.add_argument("--poll-interval", type=float, default=1)
+
+    def handle(self, *args, **options):
+        encoder = JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+        feed_options = {
+            "models": options["models"],
+            "batch_size": options["batch_size"],
+            "lag": options["lag"],
+            "settle_timeout": options["settle_timeout"],
+        }
+        if options["consumer"]:
+            batches = ChangeFeed(options["consumer"], **feed_options).batches
+        else:
+            last_id = options["after_id"]
+
+            def batches():
+                nonlocal last_id
+                while True:
+                    batch, next_id = get_changes_batch(last_id, **feed_options)
+                    if next_id == last_id:
+                        return
+                    if batch:
+                        yield batch
+                    last_id = next_id
+
+        while True:
+            for batch in batches():
+                self.stdout.write("\n".join(encoder.encode(change) for change in batch))
+                self.stdout.flush()
+            if not options["follow"]:
+                return
+            time.sleep(options["poll_interval"])
@@ -1,14 +1,21 @@
 import dataclasses
 import logging
 import threading
+import uuid
+from collections import Counter
 from copy import deepcopy
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from django.conf import settings
+from django.db import connection
 from django.utils.deprecation import MiddlewareMixin
 from rest_framework.permissions import SAFE_METHODS
 
-from .models import RequestLogChange, RequestLogRecord
+from . import constants
+from .models import RequestLogChange
+from .sinks import get_sink
+from .triggers import SESSION_REQUEST_OFF, session_request_wrapper, set_session_request
+from .utils import get_capture_engine
 
 if TYPE_CHECKING:
     from django.http import HttpRequest, HttpResponse
@@ -22,7 +29,45 @@ GLOBAL_LOG_STORE = threading.local()
 @dataclasses.dataclass
 class LogStore:
     requests_logger_changes: dict = dataclasses.field(default_factory=lambda: {})
+    requests_logger_change_types: dict = dataclasses.field(default_factory=lambda: {})
     request_should_be_logged: bool = False
+    request_token: Optional[str] = None
+    session_request_set: bool = False
+    session_request_committed: bool = False
+
+
+def get_view_path(view) -> str:
+    view = getattr(view, "view_class", view)
+    if not hasattr(view, "__qualname__"):
+        # Экземпляр класса с __call__ или functools.partial
+        view = view.__class__
+    return f"{view.__module__}.{view.__qualname__}"
+
+
+def get_route_and_view(request: "HttpRequest"):
+    resolver_match = getattr(request, "resolver_match", None)
+    if resolver_match is None:
+        return "", ""
+    url_name = resolver_match.view_name if resolver_match.url_name else resolver_match.route
+    return url_name or "", get_view_path(resolver_match.func)
+
+
+def get_changes_summary(request_log: LogStore) -> dict:
+    change_types = request_log.requests_logger_change_types
+    if request_log.session_request_set:
+        change_types = dict(
+            RequestLogChange.objects.filter(request_token=request_log.request_token).values_list(
+                "instance", "change_type"
+            )
+        )
+    change_type_counts = Counter(change_types.values())
+    return dict(
+        changes_count=len(change_types),
+        created_count=change_type_counts[constants.CHANGE_TYPE_CREATE],
+        updated_count=change_type_counts[constants.CHANGE_TYPE_UPDATE],
+        deleted_count=change_type_counts[constants.CHANGE_TYPE_DELETE],
+        changed_models=sorted({instance.rsplit(".", 1)[0] for instance in change_types}),
+    )
 
 
 def get_client_ip(request: "HttpRequest"):
@@ -41,28 +86,57 @@ class RequestsLoggerMiddleware(MiddlewareMixin):
                 GLOBAL_LOG_STORE.request_log.request_should_be_logged = getattr(
                     settings, "REQUESTS_LOGGER_SETTINGS", {}
                 ).get("LOG_REQUEST", True)
+        request_log = GLOBAL_LOG_STORE.request_log
+        if request_log.request_should_be_logged and getattr(settings, "REQUESTS_LOGGER_SETTINGS", {}).get(
+            "LOG_OBJECTS_IN_REQUEST", True
+        ):
+            # По идентификатору изменения отличаются от изменений вне запроса ещё до связывания с записью запроса
+            request_log.request_token = str(uuid.uuid4())
+            if get_capture_engine() == constants.CAPTURE_ENGINE_TRIGGERS:
+                self.start_trigger_capture(request_log)
 
     def process_response(self, request: "HttpRequest", response: "HttpResponse"):  # noqa
+        if session_request_wrapper in connection.execute_wrappers:
+            connection.execute_wrappers.remove(session_request_wrapper)
         if (request_log := deepcopy(get_request_log())) and request_log.request_should_be_logged:
             try:
                 referer = request.headers.get("Referer") or request.headers.get("Origin")
                 url = request.get_full_path()
-                record = RequestLogRecord.objects.create(
-                    user=request.user if (request.user.is_authenticated and getattr(request.user, 'pk', None)) else None,
-                    method=request.method,
-                    referer=referer[:1000] if referer else "",
-                    url=url[:1000],
-                    ip=get_client_ip(request),
-                    status_code=response.status_code,
-                )
-                RequestLogChange.objects.filter(id__in=list(request_log.requests_logger_changes.values())).update(
-                    record=record
+                url_name, view_name = get_route_and_view(request)
+                log_record = get_sink().save_record(
+                    record=dict(
+                        user_id=request.user.pk if (request.user.is_authenticated and getattr(request.user, 'pk', None)) else None,
+                        method=request.method,
+                        referer=referer[:1000] if referer else "",
+                        url=url[:1000],
+                        url_name=url_name[:255],
+                        view_name=view_name[:255],
+                        ip=get_client_ip(request),
+                        status_code=response.status_code,
+                        **get_changes_summary(request_log),
+                    ),
+                    changes=list(request_log.requests_logger_changes.values()),
                 )
+                if request_log.session_request_set and log_record is not None:
+                    RequestLogChange.objects.filter(request_token=request_log.request_token).update(record=log_record)
             except Exception as e:
                 logger.exception(e)
+        if request_log and request_log.session_request_set:
+            self.stop_trigger_capture(request_log)
         delete_request_log()
         return response
 
+    def start_trigger_capture(self, request_log: LogStore):  # noqa
+        # Идентификатор запроса передаётся в сессию перед первым запросом к базе данных,
+        # поэтому запросы без обращений к базе данных не выполняют лишних запросов
+        connection.execute_wrappers.append(session_request_wrapper)
+
+    def stop_trigger_capture(self, request_log: LogStore):  # noqa
+        try:
+            set_session_request(SESSION_REQUEST_OFF)
+        except Exception as e:
+            logger.exception(e)
+
 
 def get_request_log():
     try:
@@ -0,0 +1,27 @@
+# Generated by Django 5.0.14 on 2026-10-19 00:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drf_orm_logger', '0005_alter_requestlogchange_created_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='requestlogrecord',
+            name='url_name',
+            field=models.CharField(blank=True, default='', max_length=255, verbose_name='Маршрут'),
+        ),
+        migrations.AddField(
+            model_name='requestlogrecord',
+            name='view_name',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=255, verbose_name='Представление'),
+        ),
+        migrations.AddIndex(
+            model_name='requestlogrecord',
+            index=models.Index(fields=['url_name', 'created_at'], name='drf_orm_logger_url_name_date'),
+        ),
+    ]
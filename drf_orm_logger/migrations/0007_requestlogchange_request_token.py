@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-19 00:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drf_orm_logger', '0006_requestlogrecord_url_name_view_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='requestlogchange',
+            name='request_token',
+            field=models.UUIDField(blank=True, db_index=True, editable=False, null=True, verbose_name='Идентификатор запроса'),
+        ),
+    ]
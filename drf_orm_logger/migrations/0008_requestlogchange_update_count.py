@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-19 00:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drf_orm_logger', '0007_requestlogchange_request_token'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='requestlogchange',
+            name='update_count',
+            field=models.PositiveIntegerField(default=1, verbose_name='Количество изменений'),
+        ),
+    ]
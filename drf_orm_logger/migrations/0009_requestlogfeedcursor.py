@@ -0,0 +1,26 @@
+# Generated by Django 5.0.14 on 2026-10-19 00:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drf_orm_logger', '0008_requestlogchange_update_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestLogFeedCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='Потребитель')),
+                ('last_id', models.BigIntegerField(default=0, verbose_name='Последнее изменение')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата')),
+            ],
+            options={
+                'verbose_name': 'Курсор ленты изменений',
+                'verbose_name_plural': 'Курсоры ленты изменений',
+            },
+        ),
+    ]
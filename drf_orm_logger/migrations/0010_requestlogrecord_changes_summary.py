@@ -0,0 +1,43 @@
+# Generated by Django 5.0.14 on 2026-10-19 00:48
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drf_orm_logger', '0009_requestlogfeedcursor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='requestlogrecord',
+            name='changed_models',
+            field=models.JSONField(blank=True, default=list, verbose_name='Изменённые модели'),
+        ),
+        migrations.AddField(
+            model_name='requestlogrecord',
+            name='changes_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Изменений'),
+        ),
+        migrations.AddField(
+            model_name='requestlogrecord',
+            name='created_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Создано'),
+        ),
+        migrations.AddField(
+            model_name='requestlogrecord',
+            name='deleted_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Удалено'),
+        ),
+        migrations.AddField(
+            model_name='requestlogrecord',
+            name='updated_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Изменено'),
+        ),
+        migrations.AddIndex(
+            model_name='requestlogrecord',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['changed_models'], name='drf_orm_logger_changed_models'),
+        ),
+    ]
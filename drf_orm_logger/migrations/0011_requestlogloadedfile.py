@@ -0,0 +1,25 @@
+# Generated by Django 5.0.14 on 2026-10-19 01:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drf_orm_logger', '0010_requestlogrecord_changes_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestLogLoadedFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Файл')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата загрузки')),
+            ],
+            options={
+                'verbose_name': 'Загруженный файл лога',
+                'verbose_name_plural': 'Загруженные файлы лога',
+            },
+        ),
+    ]
@@ -1,6 +1,7 @@
 from collections import OrderedDict
 
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 
 from . import constants
@@ -15,12 +16,23 @@ class RequestLogRecord(models.Model):
     method = models.CharField(max_length=7, verbose_name="Метод")
     referer = models.CharField(max_length=1000, verbose_name="Источник")
     url = models.CharField(max_length=1000, verbose_name="Адрес")
+    url_name = models.CharField(max_length=255, blank=True, default="", verbose_name="Маршрут")
+    view_name = models.CharField(max_length=255, blank=True, default="", db_index=True, verbose_name="Представление")
     status_code = models.PositiveSmallIntegerField(verbose_name="Код ответа")
+    changes_count = models.PositiveIntegerField(default=0, verbose_name="Изменений")
+    created_count = models.PositiveIntegerField(default=0, verbose_name="Создано")
+    updated_count = models.PositiveIntegerField(default=0, verbose_name="Изменено")
+    deleted_count = models.PositiveIntegerField(default=0, verbose_name="Удалено")
+    changed_models = models.JSONField(default=list, blank=True, verbose_name="Изменённые модели")
 
     class Meta:
         ordering = ("-created_at",)
         verbose_name = "Запись"
         verbose_name_plural = "Записи"
+        indexes = (
+            models.Index(fields=("url_name", "created_at"), name="drf_orm_logger_url_name_date"),
+            GinIndex(fields=("changed_models",), name="drf_orm_logger_changed_models"),
+        )
 
     def __str__(self):
         return (
@@ -54,6 +66,10 @@ class RequestLogChange(models.Model):
     )
     instance = models.CharField(max_length=200, verbose_name="Объект", db_index=True)
     fields = models.JSONField(blank=True, null=True, verbose_name="Изменённые поля")
+    update_count = models.PositiveIntegerField(default=1, verbose_name="Количество изменений")
+    request_token = models.UUIDField(
+        null=True, blank=True, editable=False, db_index=True, verbose_name="Идентификатор запроса"
+    )
 
     class Meta:
         ordering = ("-created_at",)
@@ -74,3 +90,28 @@ class RequestLogChangeAdmin(RequestLogChange):
 
     def __str__(self):
         return ""
+
+
+class RequestLogFeedCursor(models.Model):
+    name = models.CharField(max_length=100, unique=True, verbose_name="Потребитель")
+    last_id = models.BigIntegerField(default=0, verbose_name="Последнее изменение")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата")
+
+    class Meta:
+        verbose_name = "Курсор ленты изменений"
+        verbose_name_plural = "Курсоры ленты изменений"
+
+    def __str__(self):
+        return f"{self.name} {self.last_id}"
+
+
+class RequestLogLoadedFile(models.Model):
+    name = models.CharField(max_length=255, unique=True, verbose_name="Файл")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата загрузки")
+
+    class Meta:
+        verbose_name = "Загруженный файл лога"
+        verbose_name_plural = "Загруженные файлы лога"
+
+    def __str__(self):
+        return self.name
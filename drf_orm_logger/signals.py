@@ -6,15 +6,26 @@ from typing import Optional, Type
 
 from django.apps import apps
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
 from django.db import models
 from django.db.models.fields.files import FieldFile
 from django.db.models.signals import m2m_changed, post_delete, post_init, post_save
 from rest_framework.utils.encoders import JSONEncoder
 
 from . import constants
+from .coalesce import get_coalesced_fields, get_coalescer, should_coalesce
 from .middleware import get_request_log
-from .models import RequestLogChange
-from .utils import compare_states, get_instance_as_dict, get_instance_as_dict_m2m, get_m2m_with_model, instance_to_str
+from .sinks import get_sink
+from .suspend import is_logging_suspended
+from .utils import (
+    compare_states,
+    get_capture_engine,
+    get_instance_as_dict,
+    get_instance_as_dict_m2m,
+    get_m2m_with_model,
+    instance_to_str,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -56,21 +67,40 @@ def register_change(instance: models.Model, change_type: str, changed_fields: Op
     else:
         previous_log_instance = None
 
-    if not previous_log_instance:
-        log_instance = RequestLogChange.objects.create(
-            change_type=changes["change_type"],
-            instance=instance_to_str(instance),
-            fields=changes["fields"],
-        )
-    else:
-        log_instance = RequestLogChange.objects.get(id=previous_log_instance)
-        log_instance.fields.update(changes["fields"])
-        log_instance.save(update_fields=["change_type", "fields"])
+    change = {
+        "change_type": changes["change_type"],
+        "instance": instance_to_str(instance),
+        "fields": changes["fields"],
+    }
+    if (
+        previous_log_instance is None
+        and change_type == constants.CHANGE_TYPE_UPDATE
+        and should_coalesce(instance.__class__, changes["fields"])
+    ):
+        # Объединённое изменение пишется позже без связи с запросом, но учитывается в его сводке
+        if request_log:
+            request_log.requests_logger_change_types.setdefault(instance_to_str(instance), change_type)
+        get_coalescer().add(change)
+        return
+    if get_coalesced_fields(instance.__class__) is not None:
+        # Накопленное изменение объекта пишется раньше текущего, чтобы не нарушить порядок лога
+        get_coalescer().pop(change["instance"])
+
+    if request_log and request_log.request_token:
+        change["request_token"] = request_log.request_token
+    log_instance = get_sink().save_change(
+        change=change,
+        previous=previous_log_instance,
+        in_request=request_log is not None,
+    )
     if request_log:
-        request_log.requests_logger_changes.setdefault(instance_to_str(instance), log_instance.id)
+        request_log.requests_logger_changes.setdefault(instance_to_str(instance), log_instance)
+        request_log.requests_logger_change_types.setdefault(instance_to_str(instance), change_type)
 
 
 def update_handler(sender: Type[models.Model], instance: models.Model, **kwargs):  # noqa  # noqa
+    if is_logging_suspended(sender):
+        return
     try:
         if object_should_be_logged() and instance.pk is not None:
             if kwargs.get("created"):
@@ -78,18 +108,26 @@ def update_handler(sender: Type[models.Model], instance: models.Model, **kwargs)
                 change_type = constants.CHANGE_TYPE_CREATE
             else:
                 change_type = constants.CHANGE_TYPE_UPDATE
-            register_change(
-                instance=instance,
-                change_type=change_type,
-                changed_fields=compare_states(get_instance_as_dict(instance), instance._original_state),
-            )
+            # Объект загружен, пока логирование было приостановлено
+            if not hasattr(instance, "_original_state"):
+                return
+            current_state = get_instance_as_dict(instance)
+            changed_fields = compare_states(current_state, instance._original_state)
+            # Следующее сохранение сравнивается с сохранённым сейчас состоянием
+            instance._original_state = current_state
+            # Сохранение без изменений не логируется
+            if change_type == constants.CHANGE_TYPE_UPDATE and not changed_fields:
+                return
+            register_change(instance=instance, change_type=change_type, changed_fields=changed_fields)
     except Exception as e:
         logger.exception(e)
 
 
 def delete_handler(sender: Type[models.Model], instance: models.Model, **kwargs):  # noqa  # noqa
+    if is_logging_suspended(sender):
+        return
     try:
-        if object_should_be_logged():
+        if object_should_be_logged() and hasattr(instance, "_original_state"):
             register_change(
                 instance=instance,
                 change_type=constants.CHANGE_TYPE_DELETE,
@@ -100,27 +138,35 @@ def delete_handler(sender: Type[models.Model], instance: models.Model, **kwargs)
 
 
 def m2m_change_handler(sender: Type[models.Model], instance: models.Model, **kwargs):  # noqa
-    if not object_should_be_logged():
+    if is_logging_suspended(instance.__class__) or not object_should_be_logged():
         return
     if kwargs.get("action") in ("pre_add", "pre_remove"):
         instance._original_m2m_state = get_instance_as_dict_m2m(instance)
     else:
         try:
-            register_change(
-                instance=instance,
-                change_type=constants.CHANGE_TYPE_UPDATE,
-                changed_fields=compare_states(get_instance_as_dict_m2m(instance), instance._original_m2m_state),
-            )
+            current_m2m_state = get_instance_as_dict_m2m(instance)
+            changed_fields = compare_states(current_m2m_state, instance._original_m2m_state)
+            instance._original_m2m_state = current_m2m_state
+            if not changed_fields:
+                return
+            register_change(instance=instance, change_type=constants.CHANGE_TYPE_UPDATE, changed_fields=changed_fields)
         except Exception as e:
             logger.exception(e)
 
 
 def set_original_fields(sender, instance, **kwargs):
+    if is_logging_suspended(sender):
+        return
     if object_should_be_logged():
         instance._original_state = get_instance_as_dict(instance)
 
 
 def register_signals():
+    if get_capture_engine() == constants.CAPTURE_ENGINE_TRIGGERS:
+        # Изменения пишут триггеры, созданные командой install_log_triggers
+        if connection.vendor != "postgresql":
+            raise ImproperlyConfigured("CAPTURE_ENGINE 'triggers' requires PostgreSQL")
+        return
     for model in get_models_to_log():
         dispatch_uid = f"drf_orm_logger.update_handler({model.__name__})"
         post_init.connect(set_original_fields, sender=model, dispatch_uid=dispatch_uid)
@@ -0,0 +1,238 @@
+import atexit
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Optional, Union
+
+from django.conf import settings
+from django.dispatch import receiver
+from django.test.signals import setting_changed
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import RequestLogChange, RequestLogRecord
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SINK = "drf_orm_logger.sinks.ORMSink"
+
+FSYNC_NEVER = "never"
+FSYNC_FLUSH = "flush"
+FSYNC_ROTATE = "rotate"
+
+
+def merge_fields(fields: dict, new_fields: dict):
+    """Дополнить изменения полей: у уже изменённых полей сохраняется первое старое значение."""
+    for name, field_changes in new_fields.items():
+        if name in fields:
+            fields[name]["new"] = field_changes["new"]
+        else:
+            fields[name] = field_changes
+
+
+class BaseLogSink:
+    """
+    Хранилище записей лога.
+
+    save_change вызывается на каждое зарегистрированное изменение объекта и возвращает дескриптор,
+    который сохраняется в LogStore на время запроса. Если в рамках запроса объект меняется повторно,
+    дескриптор передаётся обратно в previous. save_record вызывается в конце запроса с данными
+    запроса и списком дескрипторов всех изменений, сделанных в нём.
+    """
+
+    def save_change(self, change: dict, previous=None, in_request: bool = False):
+        raise NotImplementedError
+
+    def save_record(self, record: dict, changes: list) -> Optional[RequestLogRecord]:
+        """Возвращает созданный RequestLogRecord, если запись хранится в базе данных."""
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+
+class ORMSink(BaseLogSink):
+    """Запись в таблицы RequestLogRecord/RequestLogChange."""
+
+    def save_change(self, change: dict, previous=None, in_request: bool = False):
+        if previous is None:
+            return RequestLogChange.objects.create(**change).id
+        log_instance = RequestLogChange.objects.get(id=previous)
+        merge_fields(log_instance.fields, change["fields"])
+        log_instance.save(update_fields=["change_type", "fields"])
+        return log_instance.id
+
+    def save_record(self, record: dict, changes: list):
+        log_record = RequestLogRecord.objects.create(**record)
+        RequestLogChange.objects.filter(id__in=changes).update(record=log_record)
+        return log_record
+
+
+class SerializedLogSink(BaseLogSink):
+    """
+    Базовый класс для хранилищ, пишущих записи в виде JSON-документов.
+
+    Изменения, сделанные в рамках запроса, копятся в LogStore и пишутся вместе с записью запроса
+    одним документом ({"type": "record", ..., "changes": [...]}). Изменения вне запроса пишутся сразу
+    ({"type": "change", ...}).
+    """
+
+    encoder_class = JSONEncoder
+
+    def encode(self, entry: dict) -> str:
+        return json.dumps(entry, cls=self.encoder_class, ensure_ascii=False, separators=(",", ":"))
+
+    def emit(self, entry: dict):
+        raise NotImplementedError
+
+    def save_change(self, change: dict, previous=None, in_request: bool = False):
+        if previous is not None:
+            merge_fields(previous["fields"], change["fields"])
+            return previous
+        entry = {"created_at": timezone.now().isoformat(), **change}
+        if not in_request:
+            self.emit({"type": "change", **entry})
+        return entry
+
+    def save_record(self, record: dict, changes: list):
+        self.emit({"type": "record", "created_at": timezone.now().isoformat(), **record, "changes": changes})
+
+
+class JSONLFileSink(SerializedLogSink):
+    """
+    Буферизованная запись в JSONL-файл с ротацией по размеру и времени.
+
+    path должен содержать {pid}: каждый процесс пишет и ротирует свой файл. Ротированные файлы получают
+    суффикс с датой и загружаются в базу командой load_requests_log. Буфер сбрасывается при заполнении
+    и фоновым потоком не реже раза в flush_interval секунд.
+    fsync: never - не вызывать fsync, flush - после каждого сброса буфера, rotate - только при ротации.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 100 * 1024 * 1024,
+        rotate_interval: int = 3600,
+        buffer_size: int = 100,
+        flush_interval: float = 1.0,
+        fsync: str = FSYNC_ROTATE,
+    ):
+        if fsync not in (FSYNC_NEVER, FSYNC_FLUSH, FSYNC_ROTATE):
+            raise ValueError(f"Unknown fsync policy: {fsync!r}")
+        if "{pid}" not in path:
+            raise ValueError("path must contain {pid}: several processes must not share one file")
+        self.path_template = path
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._stream = None
+        self._pid = None
+        self._opened_at = 0.0
+        self._last_flush = time.monotonic()
+
+    @property
+    def path(self) -> str:
+        return self.path_template.format(pid=self._pid)
+
+    def emit(self, entry: dict):
+        line = (self.encode(entry) + "\n").encode("utf-8")
+        with self._lock:
+            self._check_pid()
+            self._buffer.append(line)
+            if len(self._buffer) >= self.buffer_size or time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush()
+
+    def flush(self):
+        with self._lock:
+            self._check_pid()
+            self._flush()
+
+    def _check_pid(self):
+        # После fork буфер, файл и поток сброса принадлежат родительскому процессу
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._buffer = []
+            self._stream = None
+            threading.Thread(target=self._run, name="drf_orm_logger.sink", daemon=True).start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                with self._lock:
+                    if self._pid != os.getpid():
+                        return
+                    if time.monotonic() - self._last_flush >= self.flush_interval:
+                        self._flush()
+            except Exception as e:
+                logger.exception(e)
+
+    def _flush(self):
+        if self._buffer:
+            stream = self._get_stream()
+            stream.write(b"".join(self._buffer))
+            stream.flush()
+            self._buffer = []
+            if self.fsync == FSYNC_FLUSH:
+                os.fsync(stream.fileno())
+        self._last_flush = time.monotonic()
+        if self._stream is not None and (
+            self._stream.tell() >= self.max_bytes or time.time() - self._opened_at >= self.rotate_interval
+        ):
+            self._rotate()
+
+    def _get_stream(self):
+        if self._stream is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._stream = open(self.path, "ab")
+            self._opened_at = time.time()
+        return self._stream
+
+    def _rotate(self):
+        if self.fsync != FSYNC_NEVER:
+            os.fsync(self._stream.fileno())
+        self._stream.close()
+        self._stream = None
+        os.replace(self.path, f"{self.path}.{datetime.now():%Y%m%d-%H%M%S-%f}")
+
+
+class LoggingSink(SerializedLogSink):
+    """Запись через стандартный logging. Документ доступен обработчикам в record.requests_log."""
+
+    def __init__(self, logger_name: str = "drf_orm_logger.sink", level: Union[int, str] = logging.INFO):
+        if isinstance(level, str):
+            level_name, level = level, logging.getLevelName(level.upper())
+            if not isinstance(level, int):
+                raise ValueError(f"Unknown logging level: {level_name!r}")
+        self.logger = logging.getLogger(logger_name)
+        self.level = level
+
+    def emit(self, entry: dict):
+        self.logger.log(self.level, self.encode(entry), extra={"requests_log": entry})
+
+
+@functools.lru_cache(maxsize=None)
+def get_sink() -> BaseLogSink:
+    sink_settings = getattr(settings, "REQUESTS_LOGGER_SETTINGS", {}).get("SINK", DEFAULT_SINK)
+    if isinstance(sink_settings, str):
+        sink_settings = {"BACKEND": sink_settings}
+    sink = import_string(sink_settings["BACKEND"])(**sink_settings.get("OPTIONS", {}))
+    atexit.register(sink.flush)
+    return sink
+
+
+@receiver(setting_changed)
+def reset_sink(setting, **kwargs):  # noqa
+    if setting == "REQUESTS_LOGGER_SETTINGS":
+        get_sink.cache_clear()
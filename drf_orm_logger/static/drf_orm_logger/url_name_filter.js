@@ -0,0 +1,31 @@
+window.addEventListener('load', function () {
+  document.querySelectorAll('.url-name-filter').forEach((input) => {
+    const options = document.getElementById(input.getAttribute('list'))
+    let timeout = null
+
+    input.addEventListener('input', () => {
+      clearTimeout(timeout)
+      timeout = setTimeout(() => {
+        const params = new URLSearchParams({term: input.value})
+        fetch(`${input.dataset.autocompleteUrl}?${params}`)
+          .then((response) => response.json())
+          .then((data) => {
+            options.innerHTML = ''
+            data.results.forEach((item) => {
+              const option = document.createElement('option')
+              option.value = item.id
+              options.appendChild(option)
+            })
+          })
+      }, 300)
+    })
+
+    input.addEventListener('change', () => {
+      const params = new URLSearchParams(input.dataset.queryString)
+      if (input.value) {
+        params.set(input.dataset.parameterName, input.value)
+      }
+      window.location.search = params.toString()
+    })
+  })
+})
@@ -0,0 +1,72 @@
+import contextvars
+import logging
+from contextlib import ContextDecorator
+from typing import Iterable, Optional, Union
+
+from django.db import connection
+
+from . import constants
+from .utils import get_capture_engine
+
+logger = logging.getLogger(__name__)
+
+ALL_MODELS = "*"
+
+_suspended_labels = contextvars.ContextVar("drf_orm_logger_suspended_labels", default=frozenset())
+
+
+def get_label(model: Union[str, type]) -> str:
+    if isinstance(model, str):
+        return model.lower()
+    return model._meta.label_lower
+
+
+def is_logging_suspended(model) -> bool:
+    labels = _suspended_labels.get()
+    if not labels:
+        return False
+    return ALL_MODELS in labels or model._meta.label_lower in labels or model._meta.app_label in labels
+
+
+class suspend_logging(ContextDecorator):  # noqa
+    """
+    Отключить логирование изменений в текущем потоке (или asyncio-задаче).
+
+    models - модели, метки "app_label.ModelName" или "app_label", для которых логирование отключается.
+    По умолчанию отключается для всех моделей. Можно использовать как контекстный менеджер и как декоратор:
+
+        with suspend_logging(models=[Order, "catalog"]):
+            ...
+    """
+
+    def __init__(self, models: Optional[Iterable[Union[str, type]]] = None):
+        self.labels = frozenset({ALL_MODELS}) if models is None else frozenset(get_label(m) for m in models)
+        self._tokens = []
+
+    def _recreate_cm(self):
+        # Декоратор создаёт новый экземпляр на каждый вызов, чтобы потоки не делили стек токенов
+        return suspend_logging(models=self.labels)
+
+    def __enter__(self):
+        self._tokens.append(_suspended_labels.set(_suspended_labels.get() | self.labels))
+        self._sync_triggers()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _suspended_labels.reset(self._tokens.pop())
+        if exc_type is None:
+            self._sync_triggers()
+        elif not connection.needs_rollback:
+            # Ошибка синхронизации не должна скрывать исходное исключение
+            try:
+                self._sync_triggers()
+            except Exception as e:
+                logger.exception(e)
+        return False
+
+    @staticmethod
+    def _sync_triggers():
+        if get_capture_engine() == constants.CAPTURE_ENGINE_TRIGGERS:
+            from .triggers import set_session_suspended
+
+            set_session_suspended(",".join(sorted(_suspended_labels.get())))
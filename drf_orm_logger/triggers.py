@@ -0,0 +1,187 @@
+import json
+
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from . import constants
+from .models import RequestLogChange
+from .utils import get_capture_engine, get_logged_fields
+
+SESSION_REQUEST_VARIABLE = "drf_orm_logger.request"
+SESSION_REQUEST_OFF = "off"
+SESSION_SUSPENDED_VARIABLE = "drf_orm_logger.suspended"
+FUNCTION_NAME = "drf_orm_logger_capture"
+
+# Аргументы триггера: префикс instance ("app_label.ObjectName"), столбец первичного ключа,
+# JSON {столбец: [имя поля, подпись]} и флаг LOG_OBJECTS_OUT_REQUEST.
+FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION {function}() RETURNS trigger AS $$
+DECLARE
+    request text := current_setting('{variable}', true);
+    suspended text[] := string_to_array(nullif(current_setting('{suspended_variable}', true), ''), ',');
+    label text := lower(TG_ARGV[0]);
+    in_request boolean := coalesce(request, '') <> '';
+    columns jsonb := TG_ARGV[2]::jsonb;
+    old_row jsonb;
+    new_row jsonb;
+    diff jsonb := '{{}}'::jsonb;
+    change_type text;
+    instance_str text;
+    column_name text;
+    field jsonb;
+BEGIN
+    IF '*' = ANY(suspended) OR label = ANY(suspended) OR split_part(label, '.', 1) = ANY(suspended) THEN
+        RETURN NULL;
+    END IF;
+    IF request = '{off}' OR (NOT in_request AND NOT TG_ARGV[3]::boolean) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'INSERT' THEN
+        change_type := '{create}';
+        new_row := to_jsonb(NEW);
+        instance_str := TG_ARGV[0] || '.' || (new_row ->> TG_ARGV[1]);
+    ELSIF TG_OP = 'UPDATE' THEN
+        change_type := '{update}';
+        old_row := to_jsonb(OLD);
+        new_row := to_jsonb(NEW);
+        instance_str := TG_ARGV[0] || '.' || (new_row ->> TG_ARGV[1]);
+    ELSE
+        change_type := '{delete}';
+        old_row := to_jsonb(OLD);
+        instance_str := TG_ARGV[0] || '.' || (old_row ->> TG_ARGV[1]);
+    END IF;
+
+    FOR column_name, field IN SELECT key, value FROM jsonb_each(columns) LOOP
+        IF TG_OP = 'UPDATE' THEN
+            CONTINUE WHEN (old_row -> column_name) = (new_row -> column_name);
+        ELSE
+            CONTINUE WHEN coalesce(old_row -> column_name, new_row -> column_name) = 'null'::jsonb;
+        END IF;
+        diff := diff || jsonb_build_object(
+            field ->> 0,
+            jsonb_build_object('label', field ->> 1, 'old', old_row -> column_name, 'new', new_row -> column_name)
+        );
+    END LOOP;
+
+    IF TG_OP = 'UPDATE' AND diff = '{{}}'::jsonb THEN
+        RETURN NULL;
+    END IF;
+
+    IF in_request THEN
+        -- Как и sinks.merge_fields: у уже изменённых в запросе полей сохраняется первое старое значение
+        UPDATE {table} SET fields = coalesce(fields, '{{}}'::jsonb) || (
+            SELECT jsonb_object_agg(
+                d.key,
+                CASE WHEN fields ? d.key THEN jsonb_set(d.value, '{{old}}', fields -> d.key -> 'old') ELSE d.value END
+            )
+            FROM jsonb_each(diff) AS d
+        )
+        WHERE request_token = request::uuid AND instance = left(instance_str, 200);
+        IF FOUND THEN
+            RETURN NULL;
+        END IF;
+    END IF;
+
+    INSERT INTO {table} (created_at, change_type, instance, fields, update_count, request_token)
+    VALUES (now(), change_type, left(instance_str, 200), diff, 1, CASE WHEN in_request THEN request::uuid END);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+
+def get_models_to_capture():
+    from .signals import get_models_to_log
+
+    return [
+        model
+        for model in get_models_to_log()
+        if model._meta.managed and not model._meta.proxy and model._meta.app_label != RequestLogChange._meta.app_label
+    ]
+
+
+def get_trigger_name(model) -> str:
+    return f"drf_orm_logger_{model._meta.db_table}"[:63]
+
+
+def quote_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def get_function_sql() -> str:
+    return FUNCTION_SQL.format(
+        function=FUNCTION_NAME,
+        variable=SESSION_REQUEST_VARIABLE,
+        suspended_variable=SESSION_SUSPENDED_VARIABLE,
+        off=SESSION_REQUEST_OFF,
+        create=constants.CHANGE_TYPE_CREATE,
+        update=constants.CHANGE_TYPE_UPDATE,
+        delete=constants.CHANGE_TYPE_DELETE,
+        table=connection.ops.quote_name(RequestLogChange._meta.db_table),
+    )
+
+
+def get_drop_trigger_sql(model) -> str:
+    return (
+        f"DROP TRIGGER IF EXISTS {connection.ops.quote_name(get_trigger_name(model))} "
+        f"ON {connection.ops.quote_name(model._meta.db_table)};"
+    )
+
+
+def get_create_trigger_sql(model, log_out_request: bool) -> str:
+    columns = {field.column: [field.name, str(field.verbose_name)] for field in get_logged_fields(model)}
+    arguments = (
+        f"{model._meta.app_label}.{model._meta.object_name}",
+        model._meta.pk.column,
+        json.dumps(columns, ensure_ascii=False),
+        "true" if log_out_request else "false",
+    )
+    return (
+        f"CREATE TRIGGER {connection.ops.quote_name(get_trigger_name(model))} "
+        f"AFTER INSERT OR UPDATE OR DELETE ON {connection.ops.quote_name(model._meta.db_table)} "
+        f"FOR EACH ROW EXECUTE FUNCTION {FUNCTION_NAME}({', '.join(quote_literal(a) for a in arguments)});"
+    )
+
+
+def set_session_request(value: str, using=None):
+    with (using or connection).cursor() as cursor:
+        cursor.execute("SELECT set_config(%s, %s, false)", [SESSION_REQUEST_VARIABLE, value])
+
+
+def session_request_wrapper(execute, sql, params, many, context):
+    from .middleware import get_request_log
+
+    request_log = get_request_log()
+    if request_log is not None and request_log.request_token and not request_log.session_request_committed:
+        # Флаги выставляются до set_config, чтобы его собственный запрос не попал сюда повторно
+        request_log.session_request_set = request_log.session_request_committed = True
+        set_session_request(request_log.request_token, using=context["connection"])
+        # set_config откатывается вместе с транзакцией, поэтому внутри atomic идентификатор
+        # устанавливается перед каждым запросом, пока один из запросов не выполнится вне транзакции
+        request_log.session_request_committed = not context["connection"].in_atomic_block
+    return execute(sql, params, many, context)
+
+
+@receiver(connection_created)
+def init_session_request(sender, connection, **kwargs):  # noqa
+    """
+    Соединения, открытые во время http-запроса, по умолчанию не логируют изменения (как и сигналы
+    для нелогируемых запросов). Идентификатор логируемого запроса устанавливается сразу.
+    """
+    if connection.vendor != "postgresql" or get_capture_engine() != constants.CAPTURE_ENGINE_TRIGGERS:
+        return
+    from .middleware import get_request_log
+
+    request_log = get_request_log()
+    if request_log is None:
+        return
+    if request_log.request_token:
+        request_log.session_request_set = request_log.session_request_committed = True
+    set_session_request(request_log.request_token or SESSION_REQUEST_OFF, using=connection)
+
+
+def set_session_suspended(value: str):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT set_config(%s, %s, false)", [SESSION_SUSPENDED_VARIABLE, value])
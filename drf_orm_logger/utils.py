@@ -1,21 +1,69 @@
+import functools
 from copy import deepcopy
 
+from django.conf import settings
 from django.core.files import File
+from django.dispatch import receiver
+from django.test.signals import setting_changed
 from django.db import models
 from django.db.models.expressions import BaseExpression, Combinable
 from rest_framework.exceptions import ValidationError
 
+from . import constants
+
+
+def get_capture_engine() -> str:
+    return getattr(settings, "REQUESTS_LOGGER_SETTINGS", {}).get("CAPTURE_ENGINE", constants.CAPTURE_ENGINE_SIGNALS)
+
 
 def instance_to_str(instance: "models.Model") -> str:
     return f"{instance._meta.app_label}.{instance._meta.object_name}.{instance.pk}"
 
 
+def get_model_fields_setting(setting_name: str, model) -> set:
+    model_fields = getattr(settings, "REQUESTS_LOGGER_SETTINGS", {}).get(setting_name, {})
+    for label, fields in model_fields.items():
+        if label.lower() == model._meta.label_lower:
+            return set(fields)
+    return set()
+
+
+@functools.lru_cache(maxsize=None)
+def get_logged_field_names(model) -> frozenset:
+    """
+    Имена полей модели, изменения которых логируются.
+
+    Поля задаются атрибутами модели tracked_log_fields/ignored_log_fields или настройками
+    TRACKED_FIELDS/IGNORED_FIELDS вида {"app_label.ModelName": [...]}. Если отслеживаемые поля не заданы,
+    логируются все поля, кроме игнорируемых.
+    """
+    field_names = {f.name for f in model._meta.get_fields() if f.concrete or (f.many_to_many and not f.auto_created)}
+    tracked = set(getattr(model, "tracked_log_fields", ())) | get_model_fields_setting("TRACKED_FIELDS", model)
+    if tracked:
+        field_names &= tracked
+    ignored = set(getattr(model, "ignored_log_fields", ())) | get_model_fields_setting("IGNORED_FIELDS", model)
+    return frozenset(field_names - ignored)
+
+
+@functools.lru_cache(maxsize=None)
+def get_logged_fields(model) -> tuple:
+    field_names = get_logged_field_names(model)
+    return tuple(field for field in model._meta.concrete_fields if field.name in field_names)
+
+
+@receiver(setting_changed)
+def reset_logged_fields(setting, **kwargs):  # noqa
+    if setting == "REQUESTS_LOGGER_SETTINGS":
+        get_logged_field_names.cache_clear()
+        get_logged_fields.cache_clear()
+
+
 def get_instance_as_dict(instance):
     all_field = {}
 
     deferred_fields = instance.get_deferred_fields()
 
-    for field in instance._meta.concrete_fields:
+    for field in get_logged_fields(instance.__class__):
         if field.get_attname() in deferred_fields:
             continue
 
@@ -86,7 +134,10 @@ def get_instance_as_dict_m2m(instance):
     m2m_fields = {}
 
     if instance.pk:
+        field_names = get_logged_field_names(instance.__class__)
         for f, _ in get_m2m_with_model(instance.__class__):
+            if f.name not in field_names:
+                continue
             m2m_fields[f.attname] = {obj.pk for obj in getattr(instance, f.attname).all()}
 
     return m2m_fields
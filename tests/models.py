@@ -0,0 +1,10 @@
+from django.db import models
+
+
+class Item(models.Model):
+    name = models.CharField(max_length=100, verbose_name="Название")
+    counter = models.IntegerField(default=0, verbose_name="Счётчик")
+
+
+class Tag(models.Model):
+    name = models.CharField(max_length=100, verbose_name="Название")
@@ -0,0 +1,43 @@
+import os
+
+SECRET_KEY = "drf-orm-logger-tests"
+USE_TZ = True
+DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+ROOT_URLCONF = "tests.urls"
+
+INSTALLED_APPS = [
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "django.contrib.sessions",
+    "rest_framework",
+    "drf_orm_logger",
+    "tests",
+]
+
+MIDDLEWARE = [
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "drf_orm_logger.middleware.RequestsLoggerMiddleware",
+]
+
+# Тесты триггеров выполняются только на PostgreSQL: POSTGRES_HOST=... python -m django test --settings=tests.settings
+if os.environ.get("POSTGRES_HOST"):
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "HOST": os.environ["POSTGRES_HOST"],
+            "PORT": os.environ.get("POSTGRES_PORT", ""),
+            "NAME": os.environ.get("POSTGRES_DB", "postgres"),
+            "USER": os.environ.get("POSTGRES_USER", "postgres"),
+            "PASSWORD": os.environ.get("POSTGRES_PASSWORD", ""),
+        }
+    }
+    CAPTURE_ENGINE = "triggers"
+else:
+    DATABASES = {"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}}
+    CAPTURE_ENGINE = "signals"
+
+REQUESTS_LOGGER_SETTINGS = {
+    "DISABLED_MODELS": ["auth", "contenttypes", "sessions", "drf_orm_logger"],
+    "CAPTURE_ENGINE": CAPTURE_ENGINE,
+}
@@ -0,0 +1,99 @@
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TransactionTestCase
+
+from drf_orm_logger import constants
+from drf_orm_logger.models import RequestLogChange, RequestLogRecord
+from drf_orm_logger.suspend import suspend_logging
+from drf_orm_logger.triggers import SESSION_REQUEST_OFF, set_session_request, set_session_suspended
+
+from .models import Item, Tag
+
+
+@skipUnless(connection.vendor == "postgresql", "Triggers require PostgreSQL")
+class TriggerCaptureTests(TransactionTestCase):
+    def setUp(self):
+        call_command("install_log_triggers")
+        set_session_request("")
+        set_session_suspended("")
+
+    def get_changes(self):
+        return list(RequestLogChange.objects.order_by("id"))
+
+    def test_insert(self):
+        item = Item.objects.create(name="a", counter=1)
+        [change] = self.get_changes()
+        self.assertEqual(change.change_type, constants.CHANGE_TYPE_CREATE)
+        self.assertEqual(change.instance, f"tests.Item.{item.pk}")
+        self.assertEqual(change.fields["name"], {"label": "Название", "old": None, "new": "a"})
+        self.assertEqual(change.fields["counter"], {"label": "Счётчик", "old": None, "new": 1})
+        self.assertIsNone(change.request_token)
+
+    def test_update(self):
+        item = Item.objects.create(name="a", counter=1)
+        Item.objects.filter(pk=item.pk).update(counter=2)
+        change = self.get_changes()[-1]
+        self.assertEqual(change.change_type, constants.CHANGE_TYPE_UPDATE)
+        self.assertEqual(change.fields, {"counter": {"label": "Счётчик", "old": 1, "new": 2}})
+
+    def test_noop_update(self):
+        item = Item.objects.create(name="a", counter=1)
+        item.save()
+        self.assertEqual(len(self.get_changes()), 1)
+
+    def test_delete(self):
+        item = Item.objects.create(name="a", counter=1)
+        pk = item.pk
+        item.delete()
+        change = self.get_changes()[-1]
+        self.assertEqual(change.change_type, constants.CHANGE_TYPE_DELETE)
+        self.assertEqual(change.instance, f"tests.Item.{pk}")
+        self.assertEqual(change.fields["name"], {"label": "Название", "old": "a", "new": None})
+
+    def test_request_merges_changes_and_links_record(self):
+        pk = int(self.client.post("/items/").content)
+        [change] = self.get_changes()
+        record = RequestLogRecord.objects.get()
+        self.assertEqual(change.record, record)
+        self.assertEqual(change.change_type, constants.CHANGE_TYPE_CREATE)
+        self.assertEqual(change.instance, f"tests.Item.{pk}")
+        # Повторные изменения объекта в запросе сохраняют первое старое значение
+        self.assertEqual(change.fields["counter"], {"label": "Счётчик", "old": None, "new": 3})
+        self.assertEqual((record.changes_count, record.created_count), (1, 1))
+        self.assertEqual(record.changed_models, ["tests.Item"])
+
+    def test_request_update_keeps_first_old_value(self):
+        item = Item.objects.create(name="a", counter=1)
+        self.client.post(f"/items/{item.pk}/")
+        change = self.get_changes()[-1]
+        self.assertEqual(change.record, RequestLogRecord.objects.get())
+        self.assertEqual(change.fields, {"counter": {"label": "Счётчик", "old": 1, "new": 3}})
+
+    def test_token_survives_rolled_back_first_query(self):
+        pk = int(self.client.post("/rollback/").content)
+        [change] = self.get_changes()
+        self.assertEqual(change.instance, f"tests.Item.{pk}")
+        self.assertEqual(change.record, RequestLogRecord.objects.get())
+
+    def test_off_after_logged_request(self):
+        self.client.post("/items/")
+        # Нелогируемый запрос на том же соединении
+        self.client.get("/items/")
+        self.assertEqual(len(self.get_changes()), 1)
+
+        set_session_request(SESSION_REQUEST_OFF)
+        Item.objects.create(name="b")
+        self.assertEqual(len(self.get_changes()), 1)
+
+    def test_suspended(self):
+        with suspend_logging(models=[Item]):
+            Item.objects.create(name="a")
+            Tag.objects.create(name="t")
+        with suspend_logging(models=["tests"]):
+            Tag.objects.create(name="t")
+        with suspend_logging():
+            Tag.objects.create(name="t")
+        Item.objects.create(name="b")
+        self.assertEqual([change.instance.rsplit(".", 1)[0] for change in self.get_changes()], ["tests.Tag", "tests.Item"])
@@ -0,0 +1,42 @@
+from django.db import transaction
+from django.http import HttpResponse
+from django.urls import path
+
+from .models import Item
+
+
+def create_item(request):
+    item = Item.objects.create(name="created", counter=1)
+    item.counter = 2
+    item.save()
+    item.counter = 3
+    item.save()
+    return HttpResponse(str(item.pk))
+
+
+def update_item(request, pk):
+    item = Item.objects.get(pk=pk)
+    item.counter += 1
+    item.save()
+    item.counter += 1
+    item.save()
+    return HttpResponse("ok")
+
+
+def rollback_first_query(request):
+    # Первый запрос к базе данных выполняется в откатываемой транзакции
+    try:
+        with transaction.atomic():
+            Item.objects.create(name="rolled back")
+            raise ValueError
+    except ValueError:
+        pass
+    item = Item.objects.create(name="kept")
+    return HttpResponse(str(item.pk))
+
+
+urlpatterns = [
+    path("items/", create_item),
+    path("items/<int:pk>/", update_item),
+    path("rollback/", rollback_first_query),
+]